@@ -0,0 +1,26 @@
+"""
+Logging handlers shared by the project.
+
+`RotatingFileHandler.shouldRollover` formats every record and seeks to the end of the log file on each emit to decide
+whether the file must be rotated. The log files of this project are allowed to grow to 512 MB, so running that check
+for every record is wasted work. `ThrottledRotatingFileHandler` runs it at most once per `rollover_check_interval`
+seconds, the file may therefore grow slightly past `maxBytes` before it is rotated.
+"""
+import time
+from logging.handlers import RotatingFileHandler
+
+
+class ThrottledRotatingFileHandler(RotatingFileHandler):
+    # Minimum number of seconds between two size checks
+    rollover_check_interval = 10
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._next_rollover_check = 0.0
+
+    def shouldRollover(self, record):
+        now = time.monotonic()
+        if now < self._next_rollover_check:
+            return False
+        self._next_rollover_check = now + self.rollover_check_interval
+        return super().shouldRollover(record)
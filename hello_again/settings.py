@@ -5,12 +5,13 @@ Date: 2024-12-21
 This script sets up the configuration for a Django project, including logging, environment variables, application settings, and database configuration.
 
 1. **Logging Configuration**:
-   - Uses a `RotatingFileHandler` to manage log files with a maximum size of 512 MB.
+   - Uses a `ThrottledRotatingFileHandler` to manage log files with a maximum size of 512 MB, checking the file size for rollover at most once every few seconds instead of on every record.
    - Logs are stored in `file.log`, and up to 5 backup files are maintained.
-   - The logging format includes timestamps, log levels, and messages, and the logging level is set to `DEBUG`.
+   - The logging format includes timestamps, log levels, and messages, and the logging level is set to `INFO`, so DEBUG records (such as the SQL queries Django logs in debug mode) are not formatted and written for every request.
+   - `LOGGING` configures the `loyalty_app.views` and `populate_db` loggers to write to `views.log` and `populate_db.log` with the same throttled handler, so Django sets them up once per process instead of the modules attaching a handler on every import.
 
 2. **Environment Variables**:
-   - The `.env` file is loaded from the parent directory of the project using `dotenv`.
+   - The `.env` file is loaded once from the parent directory of the project using `dotenv`, and only if it is a regular file.
    - Environment variables such as `db_username`, `db_password`, `db_host`, and `db_port` are retrieved for database configuration.
    - Errors during the loading of environment variables are logged.
 
@@ -33,6 +34,7 @@ This script sets up the configuration for a Django project, including logging, e
 8. **Database Configuration**:
    - Configures a PostgreSQL database with the name `hello_again`.
    - Credentials (`USER`, `PASSWORD`, `HOST`, `PORT`) are dynamically fetched from environment variables.
+   - `DATABASES` is a `SimpleLazyObject`, so the configuration is only built when Django first accesses the database.
 
 9. **Password Validation**:
    - Implements default Django password validation rules for security, including similarity checks, minimum length, and common password restrictions.
@@ -52,9 +54,11 @@ This script forms the backbone of the Django project's settings and ensures robu
 
 import os
 import logging
+import functools
 from pathlib import Path
+from django.utils.functional import SimpleLazyObject
 from dotenv import load_dotenv
-from logging.handlers import RotatingFileHandler
+from hello_again.log_handlers import ThrottledRotatingFileHandler
 max_log_file_size = 512 * 1024 * 1024  # 512 MB
 
 # Build the BASE_DIR path for the project
@@ -65,24 +69,67 @@ if not os.path.exists(logs_path):
 env_path = os.path.join(BASE_DIR, ".env")
 
 log_file_path = os.path.join(logs_path, 'settings.log')
-handler = RotatingFileHandler(log_file_path, maxBytes=max_log_file_size, backupCount=5)
+handler = ThrottledRotatingFileHandler(log_file_path, maxBytes=max_log_file_size, backupCount=5)
 # Configure logging
 logging.basicConfig(
-    level=logging.DEBUG,
+    level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[handler]
 )
 
+# Logging of the application modules, applied once per process by Django's setup
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'standard': {
+            'format': '%(asctime)s - %(levelname)s - %(message)s',
+        },
+    },
+    'handlers': {
+        'views_file': {
+            'class': 'hello_again.log_handlers.ThrottledRotatingFileHandler',
+            'filename': os.path.join(logs_path, 'views.log'),
+            'maxBytes': max_log_file_size,
+            'backupCount': 5,
+            'formatter': 'standard',
+        },
+        'populate_db_file': {
+            'class': 'hello_again.log_handlers.ThrottledRotatingFileHandler',
+            'filename': os.path.join(logs_path, 'populate_db.log'),
+            'maxBytes': max_log_file_size,
+            'backupCount': 5,
+            'formatter': 'standard',
+        },
+    },
+    'loggers': {
+        'loyalty_app.views': {
+            'handlers': ['views_file'],
+            'level': 'INFO',
+        },
+        # Records of the bulk load are kept in populate_db.log only instead of also propagating to the root logger
+        'loyalty_app.management.commands.populate_db': {
+            'handlers': ['populate_db_file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 # Start logging application initialization
 logging.info("Initializing Django application settings.")
 
+
+# Load the `.env` file once. Only a regular file is read, so a FIFO or device at that path can't block startup.
+@functools.lru_cache(maxsize=None)
+def load_environment():
+    if os.path.isfile(env_path):
+        load_dotenv(dotenv_path=env_path)
+
+
 # Load environment variables
 try:
-    load_dotenv(dotenv_path=env_path)
-    db_username = os.getenv("db_username")
-    db_password = os.getenv("db_password")
-    db_host = os.getenv("db_host")
-    db_port = os.getenv("db_port")
+    load_environment()
     SECRET_KEY = os.getenv("SECRET_KEY")
     logging.info("Environment variables loaded successfully")
 except Exception as e:
@@ -106,7 +153,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'loyalty_app',
 ]
-logging.info(f"Installed apps: {INSTALLED_APPS}")
+logging.info("Installed apps: %s", INSTALLED_APPS)
 
 
 MIDDLEWARE = [
@@ -154,24 +201,31 @@ SESSION_CACHE_ALIAS = 'default'
 WSGI_APPLICATION = 'hello_again.wsgi.application'
 
 
-# Log database configuration
-try:
-    DATABASES = {
-        'default': {
-            'ENGINE': 'django.db.backends.postgresql',
-            'NAME': 'hello_again',
-            'USER': f'{db_username}',
-            'PASSWORD': f'{db_password}',
-            'HOST': f'{db_host}',
-            'PORT': f'{db_port}',
+# Resolve the database configuration on first access, so commands that never touch the database skip it
+def get_database_settings():
+    try:
+        load_environment()
+        db_host = os.getenv("db_host")
+        db_port = os.getenv("db_port")
+        databases = {
+            'default': {
+                'ENGINE': 'django.db.backends.postgresql',
+                'NAME': 'hello_again',
+                'USER': f'{os.getenv("db_username")}',
+                'PASSWORD': f'{os.getenv("db_password")}',
+                'HOST': f'{db_host}',
+                'PORT': f'{db_port}',
+            }
         }
-    }
-    logging.info("Database configuration loaded successfully.")
-    logging.debug(f"Database host: {db_host}, port: {db_port}")
-except Exception as e:
-    logging.critical("Error configuring database: %s", e)
-    raise
+        logging.info("Database configuration loaded successfully.")
+        logging.debug("Database host: %s, port: %s", db_host, db_port)
+        return databases
+    except Exception as e:
+        logging.critical("Error configuring database: %s", e)
+        raise
+
 
+DATABASES = SimpleLazyObject(get_database_settings)
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -206,11 +260,11 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
-logging.info(f"Static URL set to: {STATIC_URL}")
+logging.info("Static URL set to: %s", STATIC_URL)
 
 # Primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
-logging.info(f"Default auto field type set to: {DEFAULT_AUTO_FIELD}")
+logging.info("Default auto field type set to: %s", DEFAULT_AUTO_FIELD)
 
 # Finalize logging setup
 logging.info("Django application settings initialized successfully.")
@@ -19,17 +19,23 @@ import os
 from django.contrib import admin
 from pathlib import Path
 from django.urls import path
+from django.urls import include
 from django.urls import re_path
 from django.shortcuts import render
-from django.http import FileResponse
-from loyalty_app.api import api
-from loyalty_app.views import list_entries
+from django.http import HttpResponse, Http404
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
+# Read the favicon once at startup so requests are served from memory
+favicon_path = os.path.join(BASE_DIR, 'static/favicon.ico')
+FAVICON = Path(favicon_path).read_bytes() if os.path.isfile(favicon_path) else None
+
+
 # Handle the favicon request
 def favicon_view(request):
-    return FileResponse(open(os.path.join(BASE_DIR, 'static/favicon.ico'), 'rb'))
+    if FAVICON is None:
+        raise Http404("Favicon not found")
+    return HttpResponse(FAVICON, content_type='image/x-icon', headers={'Cache-Control': 'public, max-age=604800'})
 
 
 def home(request):
@@ -38,9 +44,7 @@ def home(request):
 
 urlpatterns = [
     path('admin/', admin.site.urls),  # Admin panel
-    path('entries', list_entries, name='list_entries'),  # API endpoint for listing entries
-    path('api/entries', list_entries, name='list_entries'),  # API endpoint for listing entries
-    path('api/', api.urls),  # Ninja API endpoints
+    path('', include('loyalty_app.urls')),  # Loyalty app entries and Ninja API endpoints
     path('', home, name='home'),  # Root path with a welcome message
     re_path(r'^favicon\.ico$', favicon_view),
 ]
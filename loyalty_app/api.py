@@ -6,49 +6,23 @@ Description:
 This script defines a RESTful API for a loyalty application, built using the Django Ninja framework.
 It includes endpoints for retrieving paginated and filtered lists of users (`AppUser`) with their
 associated addresses and customer relationships, along with a simple test endpoint.
+The entries endpoint is served by `loyalty_app.views.list_entries`, which builds the JSON response itself,
+so no response schema is declared for it.
+Both are async, so they can be served by an ASGI server (`hello_again.asgi`) without tying up a worker per request.
 """
-from datetime import date, datetime
-from ninja import NinjaAPI, Schema, Query
-from typing import List, Optional
-
-
-# Define request and response schemas
-class AddressSchema(Schema):
-    id: int
-    street: str
-    street_number: str
-    city_code: str
-    city: str
-    country: str
-
-
-class CustomerRelationshipSchema(Schema):
-    id: int
-    points: int
-    created: datetime
-    last_activity: datetime
-    appuser_id: int
-
-
-class AppUserSchema(Schema):
-    id: int
-    first_name: str
-    last_name: str
-    gender: str
-    customer_id: str
-    phone_number: str
-    created: datetime
-    birthday: date
-    last_updated: datetime
-    address: List[AddressSchema]
-    customerrelationship: List[CustomerRelationshipSchema]
-
-
-class PaginatedResponse(Schema):
-    page: int
-    total_pages: int
-    total_items: int
-    results: List[AppUserSchema]
+import orjson
+from ninja import NinjaAPI, Query
+from ninja.renderers import BaseRenderer
+from typing import Optional
+from loyalty_app import views
+
+
+# Render responses with orjson, which encodes datetimes and other native types in C
+class ORJSONRenderer(BaseRenderer):
+    media_type = "application/json"
+
+    def render(self, request, data, *, response_status):
+        return orjson.dumps(data, option=orjson.OPT_UTC_Z)
 
 
 # Initialize the NinjaAPI
@@ -57,26 +31,32 @@ api = NinjaAPI(
     version="1.0.0",
     description=(
         "This API for Hello Again project Loyalty App"
-    )
+    ),
+    renderer=ORJSONRenderer(),
 )
 
 
 # Define the endpoint with NinjaAPI
-@api.get("/entries", response=PaginatedResponse, tags=["Entries"])
-def list_entries(
+@api.get("/entries", tags=["Entries"])
+async def list_entries(
         request,
         page: int = Query(1),
         page_size: int = Query(10),
         sort_by: str = Query("id", description="Field to sort by, check the API documentation for valid fields"),
         order: str = Query("asc", description="Sort order, either `asc` or `desc`"),
+        after: Optional[str] = Query(None,
+                                     description="Keyset pagination cursor, the `next_cursor` of the previous page"),
+        no_count: bool = Query(False, description="Skip the total count and report `has_next` instead"),
+        response_format: str = Query("json", alias="format",
+                                     description="Response format, either `json` or `ndjson`"),
         id: Optional[int] = Query(None, description="Filter by AppUser ID , Sample value: 1"),
         first_name: Optional[str] = Query(None, description="Filter by AppUser first name, Sample value: John"),
         last_name: Optional[str] = Query(None, description="Filter by AppUser last name, Sample value: Brown"),
-        gender: Optional[str] = Query(None, description="Filter by gender, Values: [Male, Female, Other]"),
+        gender: Optional[str] = Query(None, description="Filter by gender, Values: [M, F, O]"),
         customer_id: Optional[str] = Query(None,
                                            description="Filter by customer ID, Sample value: 91bf0d4e-f853-46b1-a8aa-6aa6ef6b43df"),
         phone_number: Optional[str] = Query(None,
-                                            description="Filter by phone number, Sample value: 001-446-868-0060x376"),
+                                            description="Filter by phone number, Sample value: 4468680060"),
         appuser_created: Optional[str] = Query(None,
                                                description="Filter by exact created date, Sample value: 2017-12-21"),
         appuser_created_after: Optional[str] = Query(None,
@@ -120,17 +100,31 @@ def list_entries(
 
     - Sorting by any valid field using the `sort_by` parameter.
 
-    - Pagination with `page` and `page_size` parameters.
+    - Pagination with `page` and `page_size` parameters, or keyset pagination with the `after` cursor.
 
     ### Query Parameters
     - `page` (int): Page number for pagination (default: 1).
 
-    - `page_size` (int): Number of items per page (default: 10).
+    - `page_size` (int): Number of items per page (default: 10, at most 10000). Larger values are reduced to the cap,
+      which every response reports as `max_page_size`.
 
-    - `sort_by` (str): Field to sort by (default: `id`).
+    - `sort_by` (str): Field to sort by (default: `id`), a leading `-` sorts descending.
 
     - `order` (str): Sort order, either `asc` or `desc` (default: `asc`).
 
+    - `after` (str): Keyset pagination cursor, the `next_cursor` of the previous page. With `sort_by=id` it is the
+      `id` of the last entry, for the other `AppUser` and `Address` fields an opaque token (sorting by
+      `CustomerRelationship` fields doesn't support it). Returns the `page_size` entries following the cursor
+      (preceding it with `order=desc`) without counting all matching entries;
+      the response has `page_size`, `next_cursor` (pass it as the next `after`, `null` on the last page) and `results`
+      instead of `page`, `total_pages` and `total_items`.
+
+    - `no_count` (bool): Skip counting the matching entries. The response has `page`, `has_next` and `results`
+      instead of `total_pages` and `total_items`.
+
+    - `format` (str): `json` (default) or `ndjson`. With `ndjson` the page is streamed as newline-delimited JSON
+      (`application/x-ndjson`), one entry per line followed by a line with the other response fields.
+
     - Additional filter parameters are dynamically matched to fields in the models.
 
     ### Sorting Fields
@@ -139,6 +133,7 @@ def list_entries(
     - `address__id`, `address__street`, `address__street_number`, `address__city_code`, `address__city`, `address__country`
 
     - `customerrelationship__id`, `customerrelationship__points`, `customerrelationship__created`, `customerrelationship__last_activity`
+      (each user is sorted by its lowest value among its relationships, the highest with `order=desc`)
 
     ### Example Query
     ```
@@ -149,6 +144,7 @@ def list_entries(
     ```json
   {
       "page": 1,
+      "max_page_size": 10000,
       "total_pages": 1,
       "total_items": 1,
       "results": [
@@ -156,7 +152,7 @@ def list_entries(
           "id": 59,
           "first_name": "Ian",
           "last_name": "Warren",
-          "gender": "Female",
+          "gender": "F",
           "customer_id": "b418bf7c-7fff-4a41-bd2c-2b6f58eeda00",
           "phone_number": "315.433.2160",
           "created": "2015-08-25T00:00:00Z",
@@ -189,6 +185,9 @@ def list_entries(
   }
     ```
     """
+    # The query parameters above document the endpoint, the shared view validates and applies them
+    return await views.list_entries(request)
+
 
 # Example additional endpoint for testing
 @api.get("/test", tags=["Test API"])
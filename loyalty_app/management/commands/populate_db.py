@@ -10,24 +10,35 @@ This script defines a Django custom management command to populate the database
    - Implements the `BaseCommand` class, allowing the command to be run via `python manage.py populate_database`.
 
 2. **Random Data Generation**:
-   - Utilizes the `faker` library to generate random but realistic data such as names, phone numbers, addresses, and dates.
-   - Ensures the uniqueness of phone numbers by maintaining a set of used numbers.
+   - Utilizes the `faker` library to sample pools of realistic values (street names, cities, countries, names) once, and draws every record's values from these pools with vectorized NumPy random indices instead of calling Faker per record.
+   - Generates customer IDs with `uuid.uuid4()` and phone numbers as random ten digit numbers, so Faker isn't called for them.
+   - Samples all phone numbers at once without replacement (`rng.choice(..., replace=False)`), which makes them unique without keeping a set of used numbers or retrying duplicates.
+   - Draws genders (one-letter codes weighted towards `M` and `F`), loyalty points and foreign keys for a whole chunk with one NumPy call each instead of calling `random` per record.
+   - Draws dates and timestamps as random offsets from the start of their range with `numpy.datetime64` arithmetic, a chunk at a time, instead of calling Faker's date providers per record.
 
 3. **Bulk Insertion**:
-   - Uses `bulk_create()` with a `batch_size` of 1000 to insert large volumes of data efficiently, reducing the overhead of individual `save()` calls.
+   - Generates plain row tuples and loads them with PostgreSQL `COPY ... FROM STDIN` (`copy_expert`), so no model instances are built and the ORM insert path is skipped.
+   - Rows are produced by generators and copied in chunks of `COPY_CHUNK_SIZE`, so memory use stays bounded by one chunk instead of growing with the number of records.
+   - Primary keys are reserved up front from the identity sequences with one `nextval()` over `generate_series()` per table and copied with the rows, so foreign keys are drawn from these NumPy `int64` arrays and no table is read back between the phases.
+   - Each worker loads its shard in a single transaction with `synchronous_commit` turned off for it, so there is one commit per shard and it doesn't wait for the WAL flush; a failed shard leaves no partial rows of its own behind.
+   - The unique constraints of `customer_id` and `phone_number` are dropped while the users are copied and created again afterwards, so each unique index is built once from sorted data instead of being updated row by row.
 
-4. **Models Populated**:
+4. **Parallel Generation**:
+   - Splits every table into one shard per CPU core and generates and copies the shards in a `multiprocessing.Pool`, so the Python work of generating rows runs on all cores and PostgreSQL receives concurrent COPY streams.
+   - Each shard has its own NumPy seed; the unique phone numbers are sampled once and sliced between the shards, and the reserved ids are sliced between the shards and passed to the workers as foreign key pools.
+
+5. **Models Populated**:
    - **Address**: Create three million records with randomly generated street names, city codes, cities, and countries.
    - **AppUser**: Links each user to a random address and generates random names, genders, unique customer IDs, and phone numbers.
    - **CustomerRelationship**: Links each record to a random user, with random loyalty points and activity timestamps.
 
-5. **Execution Time Tracking**:
+6. **Execution Time Tracking**:
    - Records the start time and calculates the total time taken to populate the database, displaying it in minutes upon completion.
 
-6. **Warning Suppression**:
+7. **Warning Suppression**:
    - Suppresses unnecessary warnings to keep the output clean.
 
-7. **Error Prevention**:
+8. **Error Prevention**:
    - Ensures uniqueness of phone numbers to avoid database constraint violations.
    - Randomly selects existing records for foreign key relationships (addresses for `AppUser` and users for `CustomerRelationship`).
 
@@ -37,38 +48,215 @@ This script defines a Django custom management command to populate the database
    ```bash
    python manage.py populate_db
 """
+import io
+import copy
 import os
-import random
+import csv
+import uuid
 import logging
+import django
+import numpy as np
+from itertools import islice
+from contextlib import contextmanager
+from multiprocessing import Pool
 from faker import Faker
-from pathlib import Path
 from datetime import date
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
+from django.db import connection, connections, transaction
 from django.core.management.base import BaseCommand
 from loyalty_app.models import Address, AppUser, CustomerRelationship
 import warnings
 warnings.filterwarnings("ignore")
 
 number_of_records = 3_000_000
-# Initialize a logger for this module
+# Sizes of the Faker value pools the records are drawn from
+STREET_POOL_SIZE = 10_000
+CITY_POOL_SIZE = 5_000
+COUNTRY_POOL_SIZE = 500
+NAME_POOL_SIZE = 5_000
+# Number of generated rows sent to the database per COPY
+COPY_CHUNK_SIZE = 100_000
+# Columns of the AppUser rows, in the order they are generated
+APPUSER_COLUMNS = (
+    'id', 'first_name', 'last_name', 'gender', 'customer_id', 'phone_number', 'created', 'address_id', 'birthday',
+    'last_updated',
+)
+# Unique AppUser columns whose constraints are dropped while the users are copied and rebuilt in one pass afterwards
+DEFERRED_UNIQUE_FIELDS = ('customer_id', 'phone_number')
+# Birthdays are drawn for people up to MAX_AGE years old
+MAX_AGE = 115
+# Phone numbers are sampled from the ten digit numbers and zero padded to ten digits
+PHONE_NUMBER_SPACE = 10 ** 10
+PHONE_NUMBER_FORMAT = '%010d'
+# Initialize a logger for this module, it writes to populate_db.log as configured in `settings.LOGGING`
 logger = logging.getLogger(__name__)
-log_file_size = 512 * 1024 * 1024  # 512 MB
-BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
-logs_path = os.path.join(BASE_DIR, 'logs')
-
-if not os.path.exists(logs_path):
-    os.makedirs(logs_path)
 
-log_file_path = os.path.join(logs_path, 'populate_db.log')
-file_handler = RotatingFileHandler(log_file_path, maxBytes=log_file_size, backupCount=5)
 
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(formatter)
-
-# Add handler to logger
-logger.addHandler(file_handler)
-logger.setLevel(logging.DEBUG)
+# Sample a pool of values from a Faker provider once; records then draw from it by index instead of calling Faker per row
+def make_pool(generate, size):
+    return np.array([generate() for _ in range(size)], dtype=object)
+
+
+# Sizes of the chunks a total number of records is generated and copied in
+def chunk_sizes(total):
+    for start in range(0, total, COPY_CHUNK_SIZE):
+        yield min(COPY_CHUNK_SIZE, total - start)
+
+
+# Load rows into the model's table with PostgreSQL COPY, skipping model instances and the ORM insert path.
+# Rows are consumed in chunks of COPY_CHUNK_SIZE, so only one chunk is held in memory at a time.
+# All chunks of a table are loaded in one transaction that commits without waiting for the WAL flush.
+def copy_rows(model, columns, rows):
+    sql = f"COPY {model._meta.db_table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    rows = iter(rows)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SET LOCAL synchronous_commit = OFF")
+        while chunk := list(islice(rows, COPY_CHUNK_SIZE)):
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(chunk)
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+
+
+# Drop the unique constraints (and their indexes) of the given fields while the block runs and create them again
+# afterwards, so PostgreSQL builds each index once from sorted data instead of updating it for every copied row.
+# Creating the constraints fails if the copied rows contain duplicates, so uniqueness is still checked.
+@contextmanager
+def deferred_unique_constraints(model, field_names):
+    fields = [model._meta.get_field(name) for name in field_names]
+    relaxed_fields = []
+    for field in fields:
+        relaxed_field = copy.copy(field)
+        relaxed_field._unique = False
+        relaxed_fields.append(relaxed_field)
+    with connection.schema_editor() as schema_editor:
+        for field, relaxed_field in zip(fields, relaxed_fields):
+            schema_editor.alter_field(model, field, relaxed_field)
+    try:
+        yield
+    finally:
+        with connection.schema_editor() as schema_editor:
+            for field, relaxed_field in zip(fields, relaxed_fields):
+                schema_editor.alter_field(model, relaxed_field, field)
+
+
+# Reserve `count` primary keys from the identity sequence of the model's table in a single query, into a NumPy
+# array (8 bytes per id). The rows are then copied with these ids, so the foreign keys of the child rows can be drawn
+# from them without reading the parent rows back. The ids are streamed from a server-side cursor.
+def reserve_ids(model, count):
+    table = model._meta.db_table
+    with connection.chunked_cursor() as cursor:
+        cursor.execute(
+            f"SELECT nextval(pg_get_serial_sequence('{table}', 'id')) FROM generate_series(1, %s)", [count]
+        )
+        return np.fromiter((row[0] for row in cursor), dtype=np.int64, count=count)
+
+
+# Split a number of records into one slice per worker and give every shard its own random seed
+def make_shards(total, workers):
+    shards = []
+    start = 0
+    for shard, seed in enumerate(np.random.SeedSequence().spawn(workers)):
+        size = total // workers + (shard < total % workers)
+        shards.append((slice(start, start + size), seed))
+        start += size
+    return shards
+
+
+# Draw `size` random dates between two dates (both included) with a single vectorized call
+def random_dates(rng, start, end, size):
+    start = np.datetime64(start, 'D')
+    days = (np.datetime64(end, 'D') - start).astype(np.int64)
+    return (start + rng.integers(0, days + 1, size=size)).tolist()
+
+
+# Draw `size` random datetimes with second precision between two datetimes with a single vectorized call
+def random_datetimes(rng, start, end, size):
+    start = np.datetime64(start, 's')
+    seconds = (np.datetime64(end, 's') - start).astype(np.int64)
+    return (start + rng.integers(0, seconds + 1, size=size)).tolist()
+
+
+# Start of the current year and now, the range of the last updated and last activity timestamps
+def this_year():
+    now = datetime.now()
+    return datetime(now.year, 1, 1), now
+
+
+# Generate and copy one shard of the Address records, every column of a chunk is drawn from its pool in one call
+def copy_addresses(ids, seed, pools):
+    rng = np.random.default_rng(seed)
+
+    def generate_addresses():
+        offset = 0
+        for size in chunk_sizes(len(ids)):
+            yield from zip(
+                ids[offset:offset + size].tolist(), *(pool[rng.integers(0, len(pool), size=size)] for pool in pools)
+            )
+            offset += size
+
+    copy_rows(Address, ('id', 'street', 'street_number', 'city_code', 'city', 'country'), generate_addresses())
+
+
+# Generate and copy one shard of the AppUser records, the shard's unique phone numbers are sampled by the caller
+def copy_users(ids, seed, phone_numbers, first_names, last_names, address_ids, start_date, end_date):
+    rng = np.random.default_rng(seed)
+    today = date.today()
+    year_start, now = this_year()
+    # Assign weights for more frequent selection of 'Male' and 'Female' for data more realistic,
+    # the one-letter codes of AppUser.GENDER_CHOICES are stored
+    weights = np.array([5, 5, 1])
+    genders = np.array([code for code, _ in AppUser.GENDER_CHOICES], dtype=object)
+    gender_probabilities = weights / weights.sum()
+
+    # Users are generated lazily chunk by chunk, so only the chunk being copied is held in memory
+    def generate_users():
+        offset = 0
+        for size in chunk_sizes(len(ids)):
+            # Every column of the whole chunk is drawn with one vectorized call
+            for user_id, first_name, last_name, gender, phone_number, created, address_id, birthday, last_updated in zip(
+                    ids[offset:offset + size].tolist(),
+                    first_names[rng.integers(0, len(first_names), size=size)],
+                    last_names[rng.integers(0, len(last_names), size=size)],
+                    rng.choice(genders, size=size, p=gender_probabilities),
+                    np.char.mod(PHONE_NUMBER_FORMAT, phone_numbers[offset:offset + size]).tolist(),
+                    random_dates(rng, start_date, end_date, size),
+                    address_ids[rng.integers(0, address_ids.size, size=size)].tolist(),
+                    random_dates(rng, date(today.year - MAX_AGE, 1, 1), today, size),
+                    random_datetimes(rng, year_start, now, size),
+            ):
+                yield (
+                    user_id,
+                    first_name,
+                    last_name,
+                    gender,
+                    uuid.uuid4(),
+                    phone_number,
+                    created,
+                    address_id,
+                    birthday,
+                    last_updated,
+                )
+            offset += size
+
+    copy_rows(AppUser, APPUSER_COLUMNS, generate_users())
+
+
+# Generate and copy one shard of the CustomerRelationship records, every column of a chunk is drawn in one call
+def copy_relationships(count, seed, user_ids, start_date, end_date):
+    rng = np.random.default_rng(seed)
+    year_start, now = this_year()
+
+    def generate_relationships():
+        for size in chunk_sizes(count):
+            yield from zip(
+                user_ids[rng.integers(0, user_ids.size, size=size)].tolist(),
+                rng.integers(0, 1001, size=size).tolist(),
+                random_dates(rng, start_date, end_date, size),
+                random_datetimes(rng, year_start, now, size),
+            )
+
+    copy_rows(CustomerRelationship, ('appuser_id', 'points', 'created', 'last_activity'), generate_relationships())
 
 
 class Command(BaseCommand):
@@ -76,86 +264,70 @@ class Command(BaseCommand):
 
     def handle(self, *args, **kwargs):
         fake = Faker()
+        rng = np.random.default_rng()
         start_time = datetime.now()
         current_year = date.today().year
         start_date = date(current_year - 10, 1, 1)
         end_date = date(current_year - 5, 1, 1)
-
-        # Assign weights for more frequent selection of 'Male' and 'Female' for data more realistic
-        weights = [5, 5, 1]
-
-        logger.info(f"Generating records started at {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
-
-        try:
-            # Insert Address records
-            addresses = [
-                Address(
-                    street=fake.street_name(),
-                    street_number=fake.building_number(),
-                    city_code=fake.zipcode(),
-                    city=fake.city(),
-                    country=fake.country(),
-                ) for _ in range(number_of_records)
-            ]
-            Address.objects.bulk_create(addresses, batch_size=1000)
-        except Exception as e:
-            logger.error(f"Error inserting Address records: {e}")
-            return
-
-        logger.info(f"{number_of_records} of address records inserted successfully in the database.")
-        # Get all addresses
-        addresses = list(Address.objects.all())
-
-        # Use a set to keep track of unique phone numbers
-        phone_numbers = set()
-        users = []
-
-        try:
-            for _ in range(number_of_records):
-                phone_number = fake.phone_number()
-
-                # Ensure phone_number is unique
-                while phone_number in phone_numbers:
-                    phone_number = fake.phone_number()
-
-                phone_numbers.add(phone_number)
-
-                users.append(AppUser(
-                    first_name=fake.first_name(),
-                    last_name=fake.last_name(),
-                    gender=random.choices(['Male', 'Female', 'Other'], weights=weights, k=1)[0],
-                    customer_id=fake.uuid4(),
-                    phone_number=phone_number,
-                    created=fake.date_between_dates(start_date, end_date),
-                    address=random.choice(addresses),
-                    birthday=fake.date_of_birth(),
-                    last_updated=fake.date_time_this_year()
-                ))
-
-            AppUser.objects.bulk_create(users, batch_size=1000)
-        except Exception as e:
-            logger.error(f"Error inserting AppUser records: {e}")
-            return
-
-        logger.info(f"{number_of_records} of user records inserted successfully in the database.")
-
-        # Get all users
-        users = list(AppUser.objects.all())
-
-        try:
-            # Insert CustomerRelationship records
-            relationships = [
-                CustomerRelationship(
-                    appuser=random.choice(users),
-                    points=random.randint(0, 1000),
-                    created=fake.date_between_dates(start_date, end_date),
-                    last_activity=fake.date_time_this_year(),
-                ) for _ in range(number_of_records)
-            ]
-            CustomerRelationship.objects.bulk_create(relationships, batch_size=1000)
-        except Exception as e:
-            logger.error(f"Error inserting CustomerRelationship records: {e}")
-            return
+        workers = os.cpu_count() or 1
+
+        logger.info(f"Generating records started at {start_time.strftime('%Y-%m-%d %H:%M:%S')} with {workers} workers")
+
+        # Reserve the primary keys up front, so every phase draws its foreign keys from memory
+        address_ids = reserve_ids(Address, number_of_records)
+        user_ids = reserve_ids(AppUser, number_of_records)
+
+        # Worker processes open their own database connections, the inherited one must not be shared with them
+        connections.close_all()
+        # django.setup() initializes each worker, so the command module can be imported there with spawn as well
+        with Pool(workers, initializer=django.setup) as pool:
+            try:
+                # Insert Address records, the Faker pools are sampled once and shared by all shards
+                pools = (
+                    make_pool(fake.street_name, STREET_POOL_SIZE),
+                    make_pool(fake.building_number, STREET_POOL_SIZE),
+                    make_pool(fake.zipcode, STREET_POOL_SIZE),
+                    make_pool(fake.city, CITY_POOL_SIZE),
+                    make_pool(fake.country, COUNTRY_POOL_SIZE),
+                )
+                pool.starmap(copy_addresses, [
+                    (address_ids[shard], seed, pools) for shard, seed in make_shards(number_of_records, workers)
+                ])
+            except Exception as e:
+                logger.error(f"Error inserting Address records: {e}")
+                return
+
+            logger.info(f"{number_of_records} of address records inserted successfully in the database.")
+
+            try:
+                first_names = make_pool(fake.first_name, NAME_POOL_SIZE)
+                last_names = make_pool(fake.last_name, NAME_POOL_SIZE)
+                # Sampling without replacement makes every phone number unique in a single call, no retries needed;
+                # each shard gets its own slice, so phone numbers stay unique across the workers
+                phone_numbers = rng.choice(PHONE_NUMBER_SPACE, size=number_of_records, replace=False)
+                with deferred_unique_constraints(AppUser, DEFERRED_UNIQUE_FIELDS):
+                    pool.starmap(copy_users, [
+                        (
+                            user_ids[shard], seed, phone_numbers[shard], first_names, last_names, address_ids,
+                            start_date, end_date,
+                        )
+                        for shard, seed in make_shards(number_of_records, workers)
+                    ])
+            except Exception as e:
+                logger.error(f"Error inserting AppUser records: {e}")
+                return
+
+            logger.info(f"{number_of_records} of user records inserted successfully in the database.")
+
+            try:
+                # Insert CustomerRelationship records
+                pool.starmap(copy_relationships, [
+                    (shard.stop - shard.start, seed, user_ids, start_date, end_date)
+                    for shard, seed in make_shards(number_of_records, workers)
+                ])
+            except Exception as e:
+                logger.error(f"Error inserting CustomerRelationship records: {e}")
+                return
 
         logger.info(f"{number_of_records} of relationship records inserted successfully in the database.")
         logger.info(f"Database populated successfully within {round((datetime.now() - start_time).seconds / 60, 2)} minutes.")
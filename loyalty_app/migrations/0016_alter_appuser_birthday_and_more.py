@@ -0,0 +1,22 @@
+# Generated by Django 5.1.4 on 2026-10-15 21:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loyalty_app', '0015_alter_address_country_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='appuser',
+            name='birthday',
+            field=models.DateField(db_index=True, default='2000-01-01'),
+        ),
+        migrations.AddIndex(
+            model_name='customerrelationship',
+            index=models.Index(fields=['appuser', 'points'], name='customerrel_appuser_15db32_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.4 on 2026-10-15 22:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loyalty_app', '0016_alter_appuser_birthday_and_more'),
+    ]
+
+    operations = [
+        # The varchar_pattern_ops index was created before the table was renamed to `appuser`, so AlterField
+        # looks for it under the new table name; drop it under its original name so the uuid cast can run
+        migrations.RunSQL(
+            'DROP INDEX IF EXISTS "loyalty_app_appuser_customer_id_7ae1f140_like";',
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name='appuser',
+            name='customer_id',
+            field=models.UUIDField(unique=True),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.4 on 2026-10-15 21:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loyalty_app', '0017_alter_appuser_customer_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appuser',
+            index=models.Index(fields=['last_updated', 'id'], name='appuser_last_up_a9b40b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appuser',
+            index=models.Index(fields=['created', 'id'], name='appuser_created_84f14d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appuser',
+            index=models.Index(fields=['last_name', 'first_name'], name='appuser_last_na_b8dfc7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appuser',
+            index=models.Index(fields=['address', 'last_updated'], name='appuser_address_c3e57d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customerrelationship',
+            index=models.Index(fields=['appuser', 'last_activity'], name='customerrel_appuser_3a777b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customerrelationship',
+            index=models.Index(fields=['appuser', 'created'], name='customerrel_appuser_a37fc6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customerrelationship',
+            index=models.Index(fields=['last_activity'], name='customerrel_last_ac_e9d73b_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.4 on 2026-10-15 21:48
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loyalty_app', '0018_appuser_appuser_last_up_a9b40b_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='address',
+            index=models.Index(django.db.models.functions.text.Upper('street'), name='address_street_upper'),
+        ),
+        migrations.AddIndex(
+            model_name='address',
+            index=models.Index(django.db.models.functions.text.Upper('city'), name='address_city_upper'),
+        ),
+        migrations.AddIndex(
+            model_name='address',
+            index=models.Index(django.db.models.functions.text.Upper('country'), name='address_country_upper'),
+        ),
+        migrations.AddIndex(
+            model_name='appuser',
+            index=models.Index(django.db.models.functions.text.Upper('first_name'), name='appuser_first_name_upper'),
+        ),
+        migrations.AddIndex(
+            model_name='appuser',
+            index=models.Index(django.db.models.functions.text.Upper('last_name'), name='appuser_last_name_upper'),
+        ),
+        migrations.AddIndex(
+            model_name='appuser',
+            index=models.Index(django.db.models.functions.text.Upper('phone_number'), name='appuser_phone_number_upper'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.4 on 2026-10-15 21:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loyalty_app', '0019_address_address_street_upper_and_more'),
+    ]
+
+    operations = [
+        # Rows written with the full gender names are shortened to their one-letter codes before the column shrinks
+        migrations.RunSQL(
+            "UPDATE appuser SET gender = LEFT(gender, 1) WHERE LENGTH(gender) > 1;",
+            reverse_sql=(
+                "UPDATE appuser SET gender = CASE gender WHEN 'M' THEN 'Male' WHEN 'F' THEN 'Female' "
+                "WHEN 'O' THEN 'Other' ELSE gender END;"
+            ),
+        ),
+        migrations.AlterField(
+            model_name='appuser',
+            name='gender',
+            field=models.CharField(choices=[('M', 'Male'), ('F', 'Female'), ('O', 'Other')], max_length=1),
+        ),
+    ]
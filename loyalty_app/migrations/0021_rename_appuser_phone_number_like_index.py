@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loyalty_app', '0020_alter_appuser_gender'),
+    ]
+
+    operations = [
+        # The varchar_pattern_ops index of phone_number was created before the table was renamed to `appuser`, so
+        # schema changes of the field (such as populate_db dropping its unique constraint during the bulk load) look
+        # for it under a name it doesn't have; give it the name derived from the current table
+        migrations.RunSQL(
+            'ALTER INDEX IF EXISTS "loyalty_app_appuser_phone_number_e0f18cc2_like" '
+            'RENAME TO "appuser_phone_number_7bf94490_like";',
+            reverse_sql=(
+                'ALTER INDEX IF EXISTS "appuser_phone_number_7bf94490_like" '
+                'RENAME TO "loyalty_app_appuser_phone_number_e0f18cc2_like";'
+            ),
+        ),
+    ]
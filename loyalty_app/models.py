@@ -9,7 +9,7 @@ This code defines three Django models that represent a data structure for a CRM-
    - It has a table name `address` and is managed by Django.
 
 2. **AppUser Model**:
-   - Represents users of the application with fields for first name, last name, gender (with predefined choices), unique customer ID, phone number, and associated address (via a foreign key to the `Address` model).
+   - Represents users of the application with fields for first name, last name, gender (stored as a one-letter code of its predefined choices), unique customer ID (stored as a native UUID), phone number, and associated address (via a foreign key to the `Address` model).
    - It also tracks the user's creation and last updated timestamps, along with an optional birthday field.
    - The table name is `appuser`, and it is managed by Django.
 
@@ -18,11 +18,14 @@ This code defines three Django models that represent a data structure for a CRM-
    - It has a foreign key linking it to the `AppUser` model.
    - The table name is `customerrelationship`, and it is managed by Django.
 
+Indexes follow the query patterns of the `entries` endpoint: `country`, `birthday` and `points` are indexed for filtering, `(appuser, points)` and `(appuser, last_activity)` serve the join to the relationships when sorting or filtering by them and `(appuser, created)` the relationship created date filters, `(created, id)` and `(last_updated, id)` serve sorting by the timestamps with the id as tiebreaker, `(last_name, first_name)` serves sorting by name, `(address, last_updated)` serves filtering by address and sorting its users, `last_activity` serves sorting relationships by it, and `UPPER()` functional indexes on the names, phone number, street, city and country serve their case-insensitive (`iexact`) filters.
+
 This structure allows the representation of users, their addresses, and their associated relationships, making it suitable for a CRM system.
 """
 import warnings
 warnings.filterwarnings('ignore')
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils.timezone import now
 
 
@@ -36,6 +39,12 @@ class Address(models.Model):
     class Meta:
         db_table = 'address'
         managed = True
+        indexes = [
+            # Text filters use `iexact`, which compares UPPER(column), so they are served by functional indexes
+            models.Index(Upper('street'), name='address_street_upper'),
+            models.Index(Upper('city'), name='address_city_upper'),
+            models.Index(Upper('country'), name='address_country_upper'),
+        ]
 
 
 class AppUser(models.Model):
@@ -46,17 +55,31 @@ class AppUser(models.Model):
     ]
     first_name = models.CharField(max_length=50)
     last_name = models.CharField(max_length=100)
-    gender = models.CharField(max_length=6, choices=GENDER_CHOICES)
-    customer_id = models.CharField(max_length=50, unique=True)
+    gender = models.CharField(max_length=1, choices=GENDER_CHOICES)
+    customer_id = models.UUIDField(unique=True)
     phone_number = models.CharField(max_length=40, unique=True)
     created = models.DateTimeField(null=False, default=now)
     address = models.ForeignKey(Address, on_delete=models.CASCADE)
-    birthday = models.DateField(null=False, default='2000-01-01')
+    birthday = models.DateField(null=False, default='2000-01-01', db_index=True)
     last_updated = models.DateTimeField(null=False, default=now)
 
     class Meta:
         db_table = 'appuser'
         managed = True
+        indexes = [
+            # Serve sorting by the timestamps, also when the sorted rows are filtered through a join;
+            # the id is the tiebreaker of every sort, so ORDER BY <field>, id LIMIT reads the index in order
+            models.Index(fields=['last_updated', 'id']),
+            models.Index(fields=['created', 'id']),
+            # Serves sorting by last name, with the first name for users sharing one
+            models.Index(fields=['last_name', 'first_name']),
+            # Serves filtering by address_id and sorting its users by last_updated in one index scan
+            models.Index(fields=['address', 'last_updated']),
+            # Text filters use `iexact`, which compares UPPER(column), so they are served by functional indexes
+            models.Index(Upper('first_name'), name='appuser_first_name_upper'),
+            models.Index(Upper('last_name'), name='appuser_last_name_upper'),
+            models.Index(Upper('phone_number'), name='appuser_phone_number_upper'),
+        ]
 
 
 class CustomerRelationship(models.Model):
@@ -68,3 +91,12 @@ class CustomerRelationship(models.Model):
     class Meta:
         db_table = 'customerrelationship'
         managed = True
+        indexes = [
+            # Serves the AppUser -> CustomerRelationship join when sorting by points
+            models.Index(fields=['appuser', 'points']),
+            # Serve the same join when filtering or sorting by the last activity
+            models.Index(fields=['appuser', 'last_activity']),
+            # Serves the relationship created date filters of the EXISTS subquery
+            models.Index(fields=['appuser', 'created']),
+            models.Index(fields=['last_activity']),
+        ]
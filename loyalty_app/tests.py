@@ -1,3 +1,385 @@
-from django.test import TestCase
+import base64
+from datetime import date, datetime, timezone
+from unittest import mock
+from uuid import UUID, uuid4
 
-# Create your tests here.
+import orjson
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from loyalty_app import views
+from loyalty_app.models import Address, AppUser, CustomerRelationship
+from loyalty_app.views import (
+    APPUSER_VALUE_FIELDS,
+    FIELD_LOOKUPS,
+    compile_filters,
+    decode_cursor,
+    encode_cursor,
+    get_next_cursor,
+    get_page_fields,
+    iterate_page,
+    log_streaming_errors,
+    serialize_entries,
+    stream_entries,
+    stream_ndjson_entries,
+    streaming_response,
+)
+
+
+# A page row in APPUSER_VALUE_FIELDS order followed by its relationships, as the page queries read it
+def make_row(**values):
+    row = {
+        "id": 42,
+        "first_name": "John",
+        "last_name": "Brown",
+        "gender": "M",
+        "customer_id": UUID("91bf0d4e-f853-46b1-a8aa-6aa6ef6b43df"),
+        "phone_number": "4468680060",
+        "created": datetime(2015, 1, 2, tzinfo=timezone.utc),
+        "birthday": date(1960, 10, 27),
+        "last_updated": datetime(2024, 3, 4, 5, 6, 7, tzinfo=timezone.utc),
+        "address__id": 7,
+        "address__street": "Main",
+        "address__street_number": "1",
+        "address__city_code": "100",
+        "address__city": "Rome",
+        "address__country": None,
+    }
+    row.update(values)
+    return tuple(row[field] for field in APPUSER_VALUE_FIELDS) + ([],)
+
+
+# Page rows with the given ids, followed by the total count column when `total_items` is given
+def make_rows(ids, total_items=None):
+    return [make_row(id=user_id) + (() if total_items is None else (total_items,)) for user_id in ids]
+
+
+# The entries of rows as a client decodes them
+def decoded_entries(rows):
+    return orjson.loads(orjson.dumps(serialize_entries(rows), option=orjson.OPT_UTC_Z))
+
+
+# Cursor token of an arbitrary JSON document, as a client could send it
+def make_token(document):
+    return base64.urlsafe_b64encode(orjson.dumps(document)).decode()
+
+
+class CursorTests(SimpleTestCase):
+    def test_id_cursor_is_the_id(self):
+        cursor = encode_cursor(make_row(), "id")
+        self.assertEqual(cursor, 42)
+        self.assertEqual(decode_cursor(str(cursor), "id"), (None, 42))
+
+    def test_round_trip(self):
+        cases = [
+            ("first_name", "John"),
+            ("created", "2015-01-02T00:00:00Z"),
+            ("birthday", "1960-10-27"),
+            ("customer_id", "91bf0d4e-f853-46b1-a8aa-6aa6ef6b43df"),
+            ("address__city", "Rome"),
+            ("address__country", None),
+        ]
+        for sort_field, value in cases:
+            with self.subTest(sort_field=sort_field):
+                cursor = encode_cursor(make_row(), sort_field)
+                self.assertIsInstance(cursor, str)
+                self.assertEqual(decode_cursor(cursor, sort_field), (value, 42))
+
+    def test_cursor_is_url_safe(self):
+        cursor = encode_cursor(make_row(first_name="???>>>"), "first_name")
+        self.assertNotRegex(cursor, r"[+/]")
+        self.assertEqual(decode_cursor(cursor, "first_name"), ("???>>>", 42))
+
+    def test_malformed_id_cursor(self):
+        for cursor in ("", "abc", "1.5", make_token(["John", 42])):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(ValueError):
+                    decode_cursor(cursor, "id")
+
+    def test_malformed_cursor(self):
+        cursors = [
+            "",
+            "zzz",
+            "not base64!",
+            "é",
+            base64.urlsafe_b64encode(b"not json").decode(),
+            make_token(42),
+            make_token(None),
+            make_token([]),
+            make_token(["John"]),
+            make_token(["John", 42, 1]),
+            make_token(["John", None]),
+            make_token(["John", []]),
+            make_token(["John", {}]),
+            make_token(["John", "abc"]),
+            make_token(["John", "42"]),
+            make_token(["John", 1.5]),
+            make_token(["John", 42.0]),
+            make_token(["John", True]),
+            make_token(["John", False]),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(ValueError):
+                    decode_cursor(cursor, "first_name")
+
+    def test_next_cursor(self):
+        row = make_row()
+        self.assertEqual(get_next_cursor(row, 10, 10, "id"), 42)
+        self.assertEqual(get_next_cursor(row, 10, 10, "first_name"), encode_cursor(row, "first_name"))
+        # A short or empty page is the last one
+        self.assertIsNone(get_next_cursor(row, 3, 10, "id"))
+        self.assertIsNone(get_next_cursor(None, 0, 10, "id"))
+
+
+class FilterLookupTests(SimpleTestCase):
+    def test_parameters_are_routed_to_their_model(self):
+        self.assertEqual(FIELD_LOOKUPS["first_name"], "first_name__iexact")
+        self.assertEqual(FIELD_LOOKUPS["city"], "address__city__iexact")
+        self.assertEqual(FIELD_LOOKUPS["points"], "customerrelationship__points__exact")
+        self.assertEqual(FIELD_LOOKUPS["last_activity"], "customerrelationship__last_activity__exact")
+
+    def test_appuser_fields_win(self):
+        # `id` and `created` are fields of several models, the AppUser ones are filtered on
+        self.assertEqual(FIELD_LOOKUPS["id"], "id__exact")
+        self.assertEqual(FIELD_LOOKUPS["created"], "created__exact")
+
+    def test_unknown_parameters_are_dropped(self):
+        self.assertEqual(
+            compile_filters((("city", "Rome"), ("unknown", "x"))),
+            (("address__city__iexact", "Rome"),),
+        )
+
+    def test_text_fields_are_matched_case_insensitively(self):
+        for parameter in ("first_name", "last_name", "phone_number", "street", "city", "country"):
+            with self.subTest(parameter=parameter):
+                self.assertTrue(FIELD_LOOKUPS[parameter].endswith("__iexact"))
+
+    def test_other_fields_are_matched_exactly(self):
+        for parameter in ("id", "customer_id", "birthday", "last_updated", "points", "last_activity"):
+            with self.subTest(parameter=parameter):
+                self.assertTrue(FIELD_LOOKUPS[parameter].endswith("__exact"))
+
+    def test_compiled_filters_are_memoized(self):
+        compile_filters.cache_clear()
+        items = (("city", "Rome"), ("points", "5"))
+        compiled = compile_filters(items)
+        self.assertIs(compile_filters(items), compiled)
+        self.assertEqual(compile_filters.cache_info().hits, 1)
+
+    def test_related_ids_are_filtered_on(self):
+        self.assertEqual(
+            compile_filters((("address_id", "7"), ("relationship_id", "3"))),
+            (("address__id__exact", "7"), ("customerrelationship__id__exact", "3")),
+        )
+
+    def test_code_fields_are_upper_cased_and_matched_exactly(self):
+        self.assertEqual(
+            compile_filters((("city_code", "ab1"), ("gender", "f"), ("street_number", "12b"))),
+            (
+                ("address__city_code__exact", "AB1"),
+                ("gender__exact", "F"),
+                ("address__street_number__exact", "12B"),
+            ),
+        )
+        # Free text keeps the value as given, `iexact` ignores its case
+        self.assertEqual(compile_filters((("city", "rome"),)), (("address__city__iexact", "rome"),))
+
+
+class StreamEntriesTests(SimpleTestCase):
+    def test_streamed_page_is_the_json_page(self):
+        rows = make_rows([1, 2, 3], total_items=3)
+        summary = {}
+        with mock.patch.object(views, "STREAMING_CHUNK_SIZE", 2):
+            chunks = iterate_page(None, iter(rows), 1, 10, None, False, "id", summary)
+            parts = list(stream_entries(get_page_fields(1, 10, None), chunks, summary))
+        # The head, one part per chunk of rows, and the summary
+        self.assertEqual(len(parts), 4)
+        self.assertEqual(
+            orjson.loads(b"".join(parts)),
+            {
+                "page": 1,
+                "max_page_size": views.MAX_PAGE_SIZE,
+                "results": decoded_entries(rows),
+                "total_pages": 1,
+                "total_items": 3,
+            },
+        )
+
+    def test_empty_streamed_page(self):
+        summary = {}
+        chunks = iterate_page(None, iter([]), 1, 10, None, False, "id", summary)
+        body = orjson.loads(b"".join(stream_entries(get_page_fields(1, 10, None), chunks, summary)))
+        self.assertEqual(body["results"], [])
+        self.assertEqual(body["total_items"], 0)
+
+
+class StreamingResponseTests(SimpleTestCase):
+    def test_wsgi_response_streams_the_generator(self):
+        response = streaming_response(RequestFactory().get("/entries"), iter([b"a", b"b"]), "application/json")
+        self.assertFalse(response.is_async)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(b"".join(response.streaming_content), b"ab")
+
+    async def test_asgi_response_reads_one_chunk_at_a_time(self):
+        sent = []
+
+        def chunks():
+            for chunk in (b"a", b"b", b"c"):
+                sent.append(chunk)
+                yield chunk
+
+        response = streaming_response(AsyncRequestFactory().get("/entries"), chunks(), "application/json")
+        self.assertTrue(response.is_async)
+        received = []
+        async for chunk in response.streaming_content:
+            received.append(chunk)
+            # Nothing is read ahead of what has been sent
+            self.assertEqual(sent, received)
+        self.assertEqual(received, [b"a", b"b", b"c"])
+
+
+class IteratePageTests(SimpleTestCase):
+    # The chunks and summary of a page read from rows, in chunks of 2 rows
+    def read_page(self, rows, page=1, page_size=10, after=None, no_count=False, queryset=None):
+        summary = {}
+        with mock.patch.object(views, "STREAMING_CHUNK_SIZE", 2):
+            chunks = list(iterate_page(queryset, iter(rows), page, page_size, after, no_count, "id", summary))
+        return chunks, summary
+
+    def test_rows_are_sent_in_chunks(self):
+        chunks, summary = self.read_page(make_rows([1, 2, 3, 4, 5], total_items=25))
+        self.assertEqual([len(entries) for entries in chunks], [2, 2, 1])
+        self.assertEqual([entry["id"] for entries in chunks for entry in entries], [1, 2, 3, 4, 5])
+        # The total count is read from the count column of the rows
+        self.assertEqual(summary, {"total_pages": 3, "total_items": 25})
+
+    def test_empty_first_page(self):
+        queryset = mock.Mock()
+        chunks, summary = self.read_page([], queryset=queryset)
+        self.assertEqual(chunks, [])
+        self.assertEqual(summary, {"total_pages": 1, "total_items": 0})
+        queryset.count.assert_not_called()
+
+    def test_page_past_the_end_is_counted(self):
+        queryset = mock.Mock()
+        queryset.count.return_value = 25
+        chunks, summary = self.read_page([], page=4, queryset=queryset)
+        self.assertEqual(chunks, [])
+        self.assertEqual(summary, {"total_pages": 3, "total_items": 25})
+
+    def test_keyset_page(self):
+        chunks, summary = self.read_page(make_rows([4, 5, 6]), page_size=3, after="3")
+        self.assertEqual([len(entries) for entries in chunks], [2, 1])
+        self.assertEqual(summary, {"next_cursor": 6})
+        # A short page is the last one
+        chunks, summary = self.read_page(make_rows([7]), page_size=3, after="6")
+        self.assertEqual(summary, {"next_cursor": None})
+
+    def test_no_count_probe_row_is_not_sent(self):
+        chunks, summary = self.read_page(make_rows([1, 2, 3, 4]), page_size=3, no_count=True)
+        self.assertEqual(chunks, [serialize_entries(make_rows([1, 2])), serialize_entries(make_rows([3]))])
+        self.assertEqual(summary, {"has_next": True})
+
+    def test_no_count_last_page(self):
+        chunks, summary = self.read_page(make_rows([1, 2, 3]), page_size=3, no_count=True)
+        self.assertEqual(chunks, [serialize_entries(make_rows([1, 2])), serialize_entries(make_rows([3]))])
+        self.assertEqual(summary, {"has_next": False})
+
+    def test_no_count_probe_alone_in_the_last_chunk(self):
+        chunks, summary = self.read_page(make_rows([1, 2, 3]), page_size=2, no_count=True)
+        self.assertEqual(chunks, [serialize_entries(make_rows([1, 2]))])
+        self.assertEqual(summary, {"has_next": True})
+
+
+class StreamNdjsonEntriesTests(SimpleTestCase):
+    def test_one_line_per_entry_then_the_summary(self):
+        rows = make_rows([1, 2, 3], total_items=3)
+        summary = {}
+        with mock.patch.object(views, "STREAMING_CHUNK_SIZE", 2):
+            chunks = iterate_page(None, iter(rows), 1, 10, None, False, "id", summary)
+            body = b"".join(stream_ndjson_entries(get_page_fields(1, 10, None), chunks, summary))
+        lines = [orjson.loads(line) for line in body.splitlines()]
+        self.assertTrue(body.endswith(b"\n"))
+        self.assertEqual(lines[:-1], decoded_entries(rows))
+        self.assertEqual(
+            lines[-1], {"page": 1, "max_page_size": views.MAX_PAGE_SIZE, "total_pages": 1, "total_items": 3}
+        )
+
+
+class LogStreamingErrorsTests(SimpleTestCase):
+    def test_error_is_logged_and_raised(self):
+        def chunks():
+            yield b"a"
+            raise RuntimeError("connection lost")
+
+        stream = log_streaming_errors(chunks())
+        self.assertEqual(next(stream), b"a")
+        with self.assertLogs("loyalty_app.views", "ERROR") as logs:
+            with self.assertRaises(RuntimeError):
+                next(stream)
+        self.assertEqual(logs.output, ["ERROR:loyalty_app.views:Error streaming entries: connection lost"])
+
+
+# The view caches its responses, a local memory cache keeps the tests off Redis
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class EntriesViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        address = Address.objects.create(street="Main", street_number="1", city_code="100", city="Rome", country="Italy")
+        cls.users = [
+            AppUser.objects.create(
+                first_name="John",
+                last_name=last_name,
+                gender="M",
+                customer_id=uuid4(),
+                phone_number=f"44686800{index}",
+                address=address,
+            )
+            for index, last_name in enumerate(("Brown", "Smith", "Adams"))
+        ]
+        for user, points in ((cls.users[0], 10), (cls.users[0], 500), (cls.users[1], 5)):
+            CustomerRelationship.objects.create(appuser=user, points=points)
+
+    def setUp(self):
+        cache.clear()
+
+    # The ids of the entries of a page
+    def get_ids(self, parameters):
+        response = self.client.get("/entries", parameters)
+        self.assertEqual(response.status_code, 200)
+        return [entry["id"] for entry in response.json()["results"]]
+
+    def test_unexpected_parameters_are_rejected(self):
+        response = self.client.get("/entries", {"zeta": "1", "bogus": "1", "city": "Rome"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "Invalid parameters: bogus, zeta"})
+
+    def test_leading_minus_sorts_descending(self):
+        brown, smith, adams = (user.id for user in self.users)
+        self.assertEqual(self.get_ids({"sort_by": "-last_name"}), [smith, brown, adams])
+        self.assertEqual(self.get_ids({"sort_by": "last_name", "order": "desc"}), [smith, brown, adams])
+
+    def test_relationship_sort_lists_each_user_once(self):
+        brown, smith, adams = (user.id for user in self.users)
+        # Users are sorted by their lowest points ascending and their highest descending, users without any last
+        self.assertEqual(self.get_ids({"sort_by": "customerrelationship__points"}), [smith, brown, adams])
+        self.assertEqual(self.get_ids({"sort_by": "-customerrelationship__points"}), [brown, smith, adams])
+
+    def test_blank_parameters_are_skipped(self):
+        ids = sorted(user.id for user in self.users)
+        self.assertEqual(self.get_ids({"last_name": "", "city": " "}), ids)
+        self.assertEqual(self.get_ids({"sort_by": ""}), ids)
+
+    def test_page_is_at_least_the_first(self):
+        response = self.client.get("/entries", {"page": "-3"})
+        self.assertEqual(response.json()["page"], 1)
+        self.assertEqual(len(response.json()["results"]), 3)
+
+    def test_page_size_is_clamped(self):
+        self.assertEqual(len(self.get_ids({"page_size": "0"})), 1)
+        with mock.patch.object(views, "MAX_PAGE_SIZE", 2):
+            response = self.client.get("/entries", {"page_size": "100"})
+        self.assertEqual(response.json()["max_page_size"], 2)
+        self.assertEqual(len(response.json()["results"]), 2)
+        self.assertEqual(response.json()["total_pages"], 2)
@@ -0,0 +1,14 @@
+"""
+URL configuration of the loyalty app, included by the project URLconf (`hello_again.urls`).
+
+Keeping the app routes here means the project URLconf doesn't import the Ninja API or the views itself;
+they are imported when Django builds the URL resolver.
+"""
+from django.urls import path
+from loyalty_app.api import api
+from loyalty_app.views import list_entries
+
+urlpatterns = [
+    path('entries', list_entries, name='list_entries'),  # API endpoint for listing entries
+    path('api/', api.urls),  # Ninja API endpoints, `api/entries` is served by the same view
+]
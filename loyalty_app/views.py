@@ -7,24 +7,33 @@ This script implements a Django view function, `list_entries`, to dynamically li
 ### Key Features:
 
 1. **Logging**:
-   - Configures a `RotatingFileHandler` to manage log files (`file.log`) with a maximum size of 512 MB and up to 5 backup files.
+   - Logs to `views.log` through the `views_file` handler of `settings.LOGGING` (a rotating file handler with a maximum size of 512 MB and up to 5 backup files), which Django configures once per process instead of the module attaching a handler on import.
    - Logs incoming requests, parameter validation, and potential errors during processing.
 
 2. **Dynamic Filtering**:
-   - Filters are extracted from the query parameters (`request.GET`).
-   - Supports case-insensitive exact matching (`iexact`) across fields in `AppUser`, `Address`, and `CustomerRelationship`.
-   - Dynamically applies filters by checking if the fields exist in the respective models.
+   - Filters are extracted from the query parameters (`request.GET`); blank values are skipped.
+   - Supports case-insensitive exact matching (`iexact`) on text fields and plain equality on numbers, dates and identifiers, so indexes on those columns can be used. The short codes (`gender`, `street_number`, `city_code`) are upper-cased and matched with plain equality as well.
+   - Routes every filter parameter, including `address_id` and `relationship_id`, through a parameter to ORM lookup map built once from the models, and applies the field and date filters with a single `filter()` call.
+   - The date parameters (`appuser_created`, `last_updated`, `relationship_created`, `last_activity` and their `_after`/`_before` variants) are read from the declarative `DATE_PARAMETERS` table, each one parsed once and mapped to its `__date` lookup.
+   - Filters on `CustomerRelationship` fields (points, relationship id, created and last activity dates) are combined into a single `EXISTS` subquery, so they all have to match the same relationship and a user with several matching relationships is returned once instead of once per joined row.
 
 3. **Sorting**:
    - Supports dynamic sorting by any field specified in the query parameter `sort_by`.
-   - Accepts an optional `order` parameter (`asc` or `desc`) to define the sort direction.
+   - Accepts an optional `order` parameter (`asc` or `desc`) to define the sort direction; a leading `-` on the sort field (`sort_by=-created`) sorts descending as well.
+   - Sorting by a `CustomerRelationship` field orders each user by the lowest value of the field among its relationships (the highest when descending), so every user appears once. The value is read with a correlated subquery on the `(appuser, field)` index; no index serves the ordering itself, so these sorts still read every matching user.
 
 4. **Pagination**:
-   - Uses Django's `Paginator` to paginate results based on `page` and `page_size` query parameters.
+   - Selects the ids of the requested page from the sorted queryset with `LIMIT`/`OFFSET` in a subquery, so only the rows of the page are joined to their address and run the relationships subquery, however deep the page is. The total count is an uncorrelated `COUNT` subquery of the same statement, so the page and the count come from a single query.
+   - With an `after` cursor (the `next_cursor` of the previous page) the page is read with keyset pagination instead: it seeks past the cursor on the index of the sort column and skips the total count, so deep pages cost the same as the first one. The response then carries a `next_cursor` instead of the page counts.
+   - When sorting by `id` the cursor is the id of the last entry; for the other `AppUser` and `Address` fields it is an opaque token of the last entry's sort value and id, and ties on the sort value are broken by the id. Sorting by `CustomerRelationship` fields can't be combined with a cursor.
+   - With `no_count=true` the total count is skipped as well: the page query reads one row past the page instead of counting every matching row, and the response carries `has_next` instead of `total_pages` and `total_items`.
+   - `page` is at least 1 and `page_size` is kept between 1 and `MAX_PAGE_SIZE`, so one request can't read an unbounded number of rows; every response reports the cap as `max_page_size`.
+   - A page past the end returns empty results with the total count instead of an error.
    - Handles invalid or missing parameters gracefully with error logging.
 
 5. **Serialization**:
-   - Serializes `AppUser` data along with related `Address` and `CustomerRelationship` fields.
+   - Reads the page rows as `values_list()` tuples so no model instances or per-row dicts are built.
+   - Collects the related `CustomerRelationship` rows of each user into a JSON array with a correlated subquery of the page query, so a page is read in a single database round trip.
    - Constructs a nested JSON response for each entry, including user details, address information, and associated customer relationships.
 
 6. **Error Handling**:
@@ -33,42 +42,42 @@ This script implements a Django view function, `list_entries`, to dynamically li
 
 7. **JSON Response**:
    - Returns a structured JSON response containing paginated results, total pages, and total items, ensuring compatibility with frontend applications.
+   - Responses are serialized with `orjson`, which encodes the datetimes, dates and UUIDs of the rows natively instead of going through `json.dumps` and `DjangoJSONEncoder`.
+   - Pages larger than `STREAMING_PAGE_SIZE` are streamed with a `StreamingHttpResponse`, fetching and serializing `STREAMING_CHUNK_SIZE` rows at a time so memory stays bounded; these responses are not cached.
+   - With `format=ndjson` any page is streamed as newline-delimited JSON (`application/x-ndjson`): one line per entry, followed by one line with the page fields (`page`, `total_pages` and `total_items`, or `next_cursor`, or `has_next`).
+
+8. **Async View**:
+   - `list_entries` is an `async def` view that runs the database and cache work of `build_entries_response` in a worker thread with `sync_to_async`.
+   - Under an ASGI server (`hello_again.asgi`) the event loop keeps accepting and answering other requests while a query is waiting on the database.
+   - Streamed pages are handed to an ASGI server as an async iterator that reads each chunk in the worker thread, since Django would read a synchronous iterator to the end before sending the first byte; under WSGI the synchronous generator is kept.
 
 ### Example Use Case:
 This function can be used in a CRM-like application where administrators need to search, filter, and manage large datasets of users, their addresses, and loyalty relationships dynamically and efficiently.
 """
 # Import the necessary modules and libraries
-import os
 import logging
+import orjson
+import base64
 import hashlib
-from pathlib import Path
+from itertools import islice
+from functools import lru_cache
+from datetime import datetime
+from asgiref.sync import sync_to_async
+from django.db import models
+from django.db.models import Exists, F, Func, OuterRef, Q, Subquery
+from django.db.models.functions import JSONObject
+from django.contrib.postgres.expressions import ArraySubquery
 from django.utils.dateparse import parse_date
 from django.core.cache import cache
-from django.http import JsonResponse
-from django.core.paginator import Paginator
-from logging.handlers import RotatingFileHandler
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
 from loyalty_app.models import AppUser, Address, CustomerRelationship
 
-# Initialize a logger for this module
+# Initialize a logger for this module, its handler and level are configured in `settings.LOGGING`
 logger = logging.getLogger(__name__)
-log_file_size = 512 * 1024 * 1024  # 512 MB
-BASE_DIR = Path(__file__).resolve().parent.parent
-logs_path = os.path.join(BASE_DIR, 'logs')
-
-if not os.path.exists(logs_path):
-    os.makedirs(logs_path)
-
-log_file_path = os.path.join(logs_path, 'views.log')
-file_handler = RotatingFileHandler(log_file_path, maxBytes=log_file_size, backupCount=5)
-
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(formatter)
-
-# Add handler to logger
-logger.addHandler(file_handler)
-logger.setLevel(logging.INFO)
 
-ALLOWED_PARAMETERS = {
+# Query parameters the endpoint accepts, a frozenset so unknown parameters are found with one set difference
+ALLOWED_PARAMETERS = frozenset({
     "page",
     "page_size",
     "sort_by",
@@ -100,7 +109,74 @@ ALLOWED_PARAMETERS = {
     "last_activity",
     "last_activity_after",
     "last_activity_before",
-}
+    "after",
+    "no_count",
+    "format",
+})
+
+# Lookup prefix of the CustomerRelationship fields, the filters with this prefix are applied through an EXISTS subquery
+RELATIONSHIP_PREFIX = "customerrelationship__"
+
+# Date parameters with the ORM lookup each one filters on, the values are parsed as dates
+DATE_PARAMETERS = (
+    ("appuser_created", "created__date"),
+    ("appuser_created_after", "created__date__gte"),
+    ("appuser_created_before", "created__date__lte"),
+    ("last_updated", "last_updated__date"),
+    ("last_updated_after", "last_updated__date__gte"),
+    ("last_updated_before", "last_updated__date__lte"),
+    ("relationship_created", f"{RELATIONSHIP_PREFIX}created__date"),
+    ("relationship_created_after", f"{RELATIONSHIP_PREFIX}created__date__gte"),
+    ("relationship_created_before", f"{RELATIONSHIP_PREFIX}created__date__lte"),
+    ("last_activity", f"{RELATIONSHIP_PREFIX}last_activity__date"),
+    ("last_activity_after", f"{RELATIONSHIP_PREFIX}last_activity__date__gte"),
+    ("last_activity_before", f"{RELATIONSHIP_PREFIX}last_activity__date__lte"),
+)
+
+# Parameters that are not field filters: sorting, pagination and the date parameters, which are applied separately
+RESERVED_PARAMETERS = frozenset({
+    "sort_by",
+    "order",
+    "page",
+    "page_size",
+    "after",
+    "no_count",
+    "format",
+}) | frozenset(parameter for parameter, _ in DATE_PARAMETERS)
+
+
+# Columns fetched for each AppUser row (with its Address), the serializer unpacks the rows positionally in this order
+APPUSER_VALUE_FIELDS = (
+    "id",
+    "first_name",
+    "last_name",
+    "gender",
+    "customer_id",
+    "phone_number",
+    "created",
+    "birthday",
+    "last_updated",
+    "address__id",
+    "address__street",
+    "address__street_number",
+    "address__city_code",
+    "address__city",
+    "address__country",
+)
+
+# Values of the `format` parameter: a JSON object, or newline-delimited JSON streamed entry by entry
+RESPONSE_FORMATS = frozenset({"json", "ndjson"})
+
+# Query string values that turn a flag parameter such as `no_count` on
+TRUE_VALUES = frozenset({"1", "true", "yes", "on"})
+
+# Largest page size served, larger requested page sizes are reduced to it. It bounds the rows a request reads, the
+# memory of the larger pages is bounded by streaming them STREAMING_CHUNK_SIZE rows at a time under WSGI and ASGI alike
+MAX_PAGE_SIZE = 10_000
+
+# Pages larger than STREAMING_PAGE_SIZE are streamed in chunks of STREAMING_CHUNK_SIZE rows
+STREAMING_PAGE_SIZE = 200
+STREAMING_CHUNK_SIZE = 50
 
 
 # generate_cache_key function to create a unique cache key for each request based on the query parameters
@@ -115,21 +191,268 @@ def generate_cache_key(request):
     return f"entries_{params_hash}"
 
 
-# Helper function to get all fields from a model
+# Helper function to get the sortable fields of a model: its concrete columns, without the reverse relations
 def get_model_fields(model):
-    return [field.name for field in model._meta.get_fields()]
+    return [field.name for field in model._meta.get_fields() if field.concrete and not field.many_to_many]
 
 
 # Get all field names for sorting validation
 appuser_fields = get_model_fields(AppUser)
 address_fields = [f"address__{field}" for field in get_model_fields(Address)]
-customerrelationship_fields = [f"customerrelationship__{field}" for field in get_model_fields(CustomerRelationship)]
+customerrelationship_fields = [f"{RELATIONSHIP_PREFIX}{field}" for field in get_model_fields(CustomerRelationship)]
+
+# Combine all field names for validation, a frozenset makes the per-request check a hash lookup
+SORTABLE_FIELDS = frozenset(appuser_fields + address_fields + customerrelationship_fields)
+
+
+# Filter parameters that name the primary key of a related table, with the ORM path of that key
+ID_FILTERS = {
+    "address_id": "address__id",
+    "relationship_id": f"{RELATIONSHIP_PREFIX}id",
+}
+
+
+# Short code columns, stored as digits and upper case letters. Their filter values are upper-cased and matched with
+# `exact`, since `iexact` compares UPPER(column), which no index of these columns serves.
+CODE_FIELDS = frozenset({"gender", "street_number", "city_code"})
+
+
+# Build the filter parameter -> ORM lookup map once, so filters are routed without per-request model introspection
+def get_field_lookups():
+    field_lookups = {}
+    # The first model that defines a field wins: AppUser, then Address, then CustomerRelationship
+    for model, prefix in ((AppUser, ""), (Address, "address__"), (CustomerRelationship, RELATIONSHIP_PREFIX)):
+        for field in model._meta.get_fields():
+            # Only free text is matched case-insensitively; codes, numbers, dates and identifiers use `exact`
+            if isinstance(field, models.CharField) and field.name not in CODE_FIELDS:
+                lookup = "iexact"
+            else:
+                lookup = "exact"
+            field_lookups.setdefault(field.name, f"{prefix}{field.name}__{lookup}")
+    for parameter, path in ID_FILTERS.items():
+        field_lookups[parameter] = f"{path}__exact"
+    return field_lookups
+
 
-# Combine all field names for validation
-all_sortable_fields = appuser_fields + address_fields + customerrelationship_fields
+FIELD_LOOKUPS = get_field_lookups()
 
 
-def list_entries(request):
+# Compile (field, value) filter pairs into (ORM lookup, value) pairs.
+# The result only depends on the pairs, so it is memoized for the query strings clients keep repeating.
+@lru_cache(maxsize=1024)
+def compile_filters(filter_items):
+    # Every parameter, the related table ids included, is routed with a single lookup in the precomputed map
+    return tuple(
+        (FIELD_LOOKUPS[field], value.upper() if field in CODE_FIELDS else value)
+        for field, value in filter_items
+        if field in FIELD_LOOKUPS
+    )
+
+
+# Number of pages needed for total_items, an empty result still has one (empty) page
+def get_total_pages(total_items, page_size):
+    return max(1, -(-total_items // page_size))
+
+
+# Correlated subquery collecting the relationships of each AppUser row into a JSON array.
+# It is only annotated on the rows of the requested page, which are selected first by id.
+def get_relationships_subquery():
+    return ArraySubquery(
+        CustomerRelationship.objects.filter(appuser=OuterRef("pk")).values(
+            json=JSONObject(
+                relationship_id="id", points="points", created="created", last_activity="last_activity"
+            )
+        )
+    )
+
+
+# Build the nested JSON entries of a page of AppUser rows.
+# Rows are `values_list()` tuples in APPUSER_VALUE_FIELDS order followed by the relationships array and are
+# unpacked positionally; any further annotation columns (such as the total count) are ignored.
+def serialize_entries(users):
+    results = []
+    for (user_id, first_name, last_name, gender, customer_id, phone_number, created, birthday, last_updated,
+         address_id, street, street_number, city_code, city, country, relationships, *_) in users:
+        # JSON has no datetime type, turn the timestamps back into datetimes so they are encoded like the others
+        relationships = [
+            {
+                "relationship_id": relationship["relationship_id"],
+                "points": relationship["points"],
+                "created": datetime.fromisoformat(relationship["created"]),
+                "last_activity": datetime.fromisoformat(relationship["last_activity"]),
+            }
+            for relationship in relationships
+        ]
+        results.append(
+            {
+                "id": user_id,
+                "first_name": first_name,
+                "last_name": last_name,
+                "gender": gender,
+                "customer_id": customer_id,
+                "phone_number": phone_number,
+                "created": created,
+                "birthday": birthday,
+                "last_updated": last_updated,
+                "address": {
+                    "address_id": address_id,
+                    "street": street,
+                    "street_number": street_number,
+                    "city_code": city_code,
+                    "city": city,
+                    "country": country,
+                },
+                "customer_relationships": relationships,
+            }
+        )
+    return results
+
+
+# Serialize a response body with orjson, which encodes datetimes, UUIDs and dates in C instead of DjangoJSONEncoder
+def json_response(data, status=200):
+    return HttpResponse(orjson.dumps(data, option=orjson.OPT_UTC_Z), content_type="application/json", status=status)
+
+
+# Keyset cursor of a row: its id when sorting by id, otherwise a URL-safe token of the row's sort value and id
+def encode_cursor(user, sort_field):
+    if sort_field == "id":
+        return user[0]
+    value = user[APPUSER_VALUE_FIELDS.index(sort_field)]
+    return base64.urlsafe_b64encode(orjson.dumps([value, user[0]], option=orjson.OPT_UTC_Z)).decode()
+
+
+# Read a keyset cursor back into the (sort value, id) pair it was made from, raising ValueError if it is malformed
+def decode_cursor(cursor, sort_field):
+    if sort_field == "id":
+        return None, int(cursor)
+    # Tokens that don't decode to a [value, id] pair raise TypeError or ValueError on the way
+    try:
+        value, cursor_id = orjson.loads(base64.urlsafe_b64decode(cursor))
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    # The id has to be a JSON integer, floats, booleans and strings are not converted
+    if type(cursor_id) is not int:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return value, cursor_id
+
+
+# Cursor for the page after a keyset page: the cursor of its last row, or None when the page is the last one
+def get_next_cursor(last_user, page_length, page_size, sort_field):
+    return encode_cursor(last_user, sort_field) if last_user is not None and page_length == page_size else None
+
+
+# Fields of a page that are known before its rows are read: the page number (the page size of a keyset page) and the
+# page size cap
+def get_page_fields(page, page_size, after):
+    page_fields = {"page": page} if after is None else {"page_size": page_size}
+    page_fields["max_page_size"] = MAX_PAGE_SIZE
+    return page_fields
+
+
+# Serialize the rows of a page STREAMING_CHUNK_SIZE rows at a time, yielding the entries of each chunk.
+# The total count (or the next cursor of a keyset page, or whether a next page exists without the count) is only known
+# once the rows have been read, so it is added to `summary` after the last chunk.
+def iterate_page(queryset, rows, page, page_size, after, no_count, sort_field, summary):
+    total_items = None
+    has_next = False
+    last_user = None
+    page_length = 0
+    while users := list(islice(rows, STREAMING_CHUNK_SIZE)):
+        if no_count:
+            # The row fetched past the page only tells that there is a next page, it is not sent
+            has_next = page_length + len(users) > page_size
+            users = users[:page_size - page_length]
+            if not users:
+                break
+        elif after is None:
+            total_items = users[0][-1]
+        last_user = users[-1]
+        page_length += len(users)
+        yield serialize_entries(users)
+    if after is not None:
+        summary["next_cursor"] = get_next_cursor(last_user, page_length, page_size, sort_field)
+    elif no_count:
+        summary["has_next"] = has_next
+    elif total_items is None:
+        # The page is empty: no row carries the count, so it is 0 on the first page and counted separately past the end
+        total_items = 0 if page == 1 else queryset.count()
+    if after is None and not no_count:
+        summary["total_pages"] = get_total_pages(total_items, page_size)
+        summary["total_items"] = total_items
+
+
+# Encode a dict as the members of a JSON object, without its braces
+def encode_members(fields):
+    return orjson.dumps(fields, option=orjson.OPT_UTC_Z)[1:-1]
+
+
+# Stream a page as a JSON object, its summary fields are written after the results
+def stream_entries(page_fields, chunks, summary):
+    yield b"{" + encode_members(page_fields) + b',"results":['
+    separator = b""
+    for entries in chunks:
+        # The entries of a chunk are encoded as one array, its brackets are left out
+        yield separator + orjson.dumps(entries, option=orjson.OPT_UTC_Z)[1:-1]
+        separator = b","
+    yield b"]," + encode_members(summary) + b"}"
+
+
+# Stream a page as newline-delimited JSON: one line per entry, then one line with the page fields and the summary
+def stream_ndjson_entries(page_fields, chunks, summary):
+    for entries in chunks:
+        yield b"".join(orjson.dumps(entry, option=orjson.OPT_UTC_Z | orjson.OPT_APPEND_NEWLINE) for entry in entries)
+    yield orjson.dumps({**page_fields, **summary}, option=orjson.OPT_APPEND_NEWLINE)
+
+
+# Pass the chunks of a stream through, logging an error that cuts it short
+def log_streaming_errors(chunks):
+    try:
+        yield from chunks
+    except Exception as e:
+        # The status line is already sent, so the error can only be logged and the stream cut short
+        logger.error("Error streaming entries: %s", e)
+        raise
+
+
+# Iterate a synchronous generator from async code, every step runs in the worker thread of the view
+async def iterate_in_thread(generator):
+    while (chunk := await sync_to_async(next)(generator, None)) is not None:
+        yield chunk
+
+
+# Stream the chunks of a page for the server the request came from. Django reads a synchronous iterator to the end
+# before sending anything under ASGI, and an asynchronous one under WSGI, so under ASGI the chunks are read one at a
+# time in the worker thread and under WSGI the generator is passed as it is.
+def streaming_response(request, chunks, content_type):
+    chunks = log_streaming_errors(chunks)
+    if isinstance(request, ASGIRequest):
+        chunks = iterate_in_thread(chunks)
+    return StreamingHttpResponse(chunks, content_type=content_type)
+
+
+# Order the entries by the sort field, ties are broken by the id so pages (and keyset cursors) follow one stable order
+def order_entries(queryset, sort_field, order):
+    if sort_field == "id":
+        return queryset.order_by("-id" if order == "desc" else "id")
+    if sort_field.startswith(RELATIONSHIP_PREFIX):
+        # A user with several relationships is sorted once, by the lowest value of the field among them (the
+        # highest when descending). The value is read per user with a correlated subquery on the
+        # (appuser, field) index instead of joining the relationships and grouping every matching user.
+        relationship_field = sort_field.removeprefix(RELATIONSHIP_PREFIX)
+        sort_values = CustomerRelationship.objects.filter(appuser=OuterRef("pk")).values(relationship_field)
+        if order == "desc":
+            return queryset.annotate(
+                relationship_sort_value=Subquery(sort_values.order_by(f"-{relationship_field}")[:1])
+            ).order_by(F("relationship_sort_value").desc(nulls_last=True), "-id")
+        return queryset.annotate(
+            relationship_sort_value=Subquery(sort_values.order_by(relationship_field)[:1])
+        ).order_by("relationship_sort_value", "id")
+    if order == "desc":
+        return queryset.order_by(f"-{sort_field}", "-id")
+    return queryset.order_by(sort_field, "id")
+
+
+def build_entries_response(request):
     """
     Lists entries from AppUser, Address, and CustomerRelationship.
     Includes filtering, sorting, and pagination with support for dynamic filters and date queries.
@@ -137,231 +460,190 @@ def list_entries(request):
     try:
         if request.method != "GET":
             logger.error("Invalid request method: %s", request.method)
-            return JsonResponse({"error": "Invalid request method"}, status=405)
+            return json_response({"error": "Invalid request method"}, status=405)
         cache_key = generate_cache_key(request)
         cached_data = cache.get(cache_key)
 
         if cached_data:
             logger.info("Returning cached data for cache key: %s", cache_key)
-            return JsonResponse(cached_data)
+            return json_response(cached_data)
     except Exception as e:
         logger.error("Error generating cache key: %s", e)
-        return JsonResponse({"error": "Error generating cache key"}, status=500)
+        return json_response({"error": "Error generating cache key"}, status=500)
 
     logger.info("Incoming request to entries endpoint with parameters: %s", request.GET.dict())
 
     # Validate query parameters
-    unexpected_parameters = [param for param in request.GET if param not in ALLOWED_PARAMETERS]
+    unexpected_parameters = request.GET.keys() - ALLOWED_PARAMETERS
     if unexpected_parameters:
+        unexpected_parameters = sorted(unexpected_parameters)
         logger.error("Unexpected parameters: %s", unexpected_parameters)
-        return JsonResponse(
+        return json_response(
             {"error": f"Invalid parameters: {', '.join(unexpected_parameters)}"}, status=400
         )
 
     try:
         # Extract filter and sort parameters
-        filters = {key: value for key, value in request.GET.items() if
-                   key not in ["sort_by", "order", "page", "page_size"]}
-        sort_by = request.GET.get("sort_by", "id")
+        # Blank values are skipped instead of matching every row against an empty string
+        filters = {
+            key: value for key, value in request.GET.items() if key not in RESERVED_PARAMETERS and value.strip()
+        }
+        sort_by = request.GET.get("sort_by", "").strip() or "id"
         order = request.GET.get("order", "asc")
-        page = int(request.GET.get("page", 1))
-        page_size = int(request.GET.get("page_size", 10))
+        # A leading `-` on the sort field sorts descending, like `order=desc`
+        if sort_by.startswith("-"):
+            sort_by = sort_by[1:]
+            order = "desc"
+        # The page size is bounded, so a single request can't read an unlimited number of rows
+        page = max(int(request.GET.get("page", 1)), 1)
+        page_size = min(max(int(request.GET.get("page_size", 10)), 1), MAX_PAGE_SIZE)
+        # Keyset pagination cursor: the next_cursor of the previous page
+        after = request.GET.get("after")
+        # Leave out the total count and only report whether a next page exists
+        no_count = request.GET.get("no_count", "false").lower() in TRUE_VALUES
+        response_format = request.GET.get("format", "json")
 
         # Validate the sort field
-        if sort_by not in all_sortable_fields:
+        if sort_by not in SORTABLE_FIELDS:
             logger.error("Invalid sort_by field: %s", sort_by)
-            return JsonResponse({"error": f"Invalid sort_by field: {sort_by}"}, status=400)
+            return json_response({"error": f"Invalid sort_by field: {sort_by}"}, status=400)
+        if response_format not in RESPONSE_FORMATS:
+            logger.error("Invalid format: %s", response_format)
+            return json_response({"error": f"Invalid format: {response_format}"}, status=400)
+        if after is not None:
+            # Keyset pagination needs the sort value in the page rows and a single row per user,
+            # so the CustomerRelationship fields can't be used with it
+            if sort_by not in APPUSER_VALUE_FIELDS:
+                logger.error("The after cursor can't be used with sort_by field: %s", sort_by)
+                return json_response(
+                    {"error": f"The after cursor is not supported when sorting by {sort_by}"}, status=400
+                )
+            after_value, after_id = decode_cursor(after, sort_by)
 
         logger.info("Parameters extracted successfully")
     except ValueError:
         logger.error("Invalid query parameters")
-        return JsonResponse({"error": "Invalid query parameters"}, status=400)
+        return json_response({"error": "Invalid query parameters"}, status=400)
 
-    # Validate sort order
-    if order == "desc":
-        sort_by = f"-{sort_by}"
+    sort_field = sort_by
+
+    # Build the base queryset, the related rows are fetched as plain values during serialization
+    queryset = AppUser.objects.all()
+    # Check the log level once, so the per-filter debug calls are skipped entirely at the default INFO level
+    log_debug = logger.isEnabledFor(logging.DEBUG)
 
-    # Build the base queryset
-    queryset = AppUser.objects.select_related("address").prefetch_related("customerrelationship_set")
+    # The AppUser and Address filters are collected and applied with a single filter() call, which builds one WHERE
+    # clause instead of cloning the queryset once per filter
+    field_filters = {}
+    # Filters on CustomerRelationship fields are collected and applied as one EXISTS subquery, so a user with several
+    # matching relationships is not repeated by a join; all of them have to match the same relationship
+    relationship_filters = {}
 
     try:
-        for field, value in filters.items():
-            if field == "address_id":  # Specific handling for address_id
-                queryset = queryset.filter(address__id=value)
-                logger.debug("Filtering by Address ID: %s", value)
-            elif hasattr(AppUser, field):  # Filter for AppUser fields
-                queryset = queryset.filter(**{f"{field}__iexact": value})
-                logger.debug("Filtering AppUser by %s: %s", field, value)
-            elif hasattr(Address, field):  # Filter for Address fields
-                queryset = queryset.filter(**{f"address__{field}__iexact": value})
-                logger.debug("Filtering Address by %s: %s", field, value)
-            elif field == "relationship_id":  # Specific handling for relationship_id
-                queryset = queryset.filter(customerrelationship__id=value)  # Use related ForeignKey
-                logger.debug("Filtering by Relationship ID: %s", value)
-            elif hasattr(CustomerRelationship, field):  # Filter for CustomerRelationship fields
-                queryset = queryset.filter(**{f"customerrelationship__{field}__iexact": value})
-                logger.debug("Filtering CustomerRelationship by %s: %s", field, value)
+        # Compile the filters into ORM lookups, repeated queries hit the cache of compile_filters
+        lookups = list(compile_filters(tuple(sorted(filters.items()))))
+        # Add the date filters from their declarative table, values that aren't dates are ignored
+        for parameter, lookup in DATE_PARAMETERS:
+            value = request.GET.get(parameter)
+            if value and (parsed_date := parse_date(value)):
+                lookups.append((lookup, parsed_date))
+        for lookup, value in lookups:
+            if lookup.startswith(RELATIONSHIP_PREFIX):
+                relationship_filters[lookup.removeprefix(RELATIONSHIP_PREFIX)] = value
+            else:
+                field_filters[lookup] = value
+            if log_debug:
+                logger.debug("Filtering by %s: %s", lookup, value)
     except Exception as e:
         logger.error("Error applying filters: %s", e)
-        return JsonResponse({"error": "Error applying filters"}, status=400)
+        return json_response({"error": "Error applying filters"}, status=400)
 
     try:
-        # Filter by CustomerRelationship ID
-        relationship_id = request.GET.get("relationship_id")
-        if relationship_id:
-            queryset = queryset.filter(customerrelationship__id=relationship_id)
-            logger.debug("Filtering by CustomerRelationship ID: %s", relationship_id)
-
-        # Separate filtering for AppUser's `created`
-        appuser_created = request.GET.get("appuser_created")
-        appuser_created_after = request.GET.get("appuser_created_after")
-        appuser_created_before = request.GET.get("appuser_created_before")
-
-        if appuser_created:
-            appuser_created_date = parse_date(appuser_created)
-            if appuser_created_date:
-                queryset = queryset.filter(created__date=appuser_created_date)
-                logger.debug("Filtering AppUser by exact created date: %s", appuser_created_date)
-        if appuser_created_after:
-            appuser_created_after_date = parse_date(appuser_created_after)
-            if appuser_created_after_date:
-                queryset = queryset.filter(created__date__gte=appuser_created_after_date)
-                logger.debug("Filtering AppUser by created_after date: %s", appuser_created_after_date)
-        if appuser_created_before:
-            appuser_created_before_date = parse_date(appuser_created_before)
-            if appuser_created_before_date:
-                queryset = queryset.filter(created__date__lte=appuser_created_before_date)
-                logger.debug("Filtering AppUser by created_before date: %s", appuser_created_before_date)
-
-        # Separate filtering for CustomerRelationship's `created`
-        relationship_created = request.GET.get("relationship_created")
-        relationship_created_after = request.GET.get("relationship_created_after")
-        relationship_created_before = request.GET.get("relationship_created_before")
-
-        date_filters = {}
-        if relationship_created:
-            relationship_created_date = parse_date(relationship_created)
-            if relationship_created_date:
-                queryset = queryset.filter(customerrelationship__created__date=relationship_created_date)
-                logger.debug("Filtering CustomerRelationship by exact created date: %s", relationship_created_date)
-        if relationship_created_after:
-            relationship_created_after_date = parse_date(relationship_created_after)
-            if relationship_created_after_date:
-                date_filters['customerrelationship__created__date__gte'] = relationship_created_after_date
-                logger.debug("Filtering CustomerRelationship by created_after date: %s",
-                             relationship_created_after_date)
-        if relationship_created_before:
-            relationship_created_before_date = parse_date(relationship_created_before)
-            if relationship_created_before_date:
-                date_filters['customerrelationship__created__date__lte'] = relationship_created_before_date
-                logger.debug("Filtering CustomerRelationship by created_before date: %s",
-                             relationship_created_before_date)
-
-        # Similarly handle `last_updated` in `AppUser`
-        last_updated = request.GET.get("last_updated")
-        last_updated_after = request.GET.get("last_updated_after")
-        last_updated_before = request.GET.get("last_updated_before")
-
-        if last_updated:
-            last_updated_date = parse_date(last_updated)
-            if last_updated_date:
-                queryset = queryset.filter(last_updated__date=last_updated_date)
-                logger.debug("Filtering by exact last_updated date: %s", last_updated_date)
-        if last_updated_after:
-            last_updated_after_date = parse_date(last_updated_after)
-            if last_updated_after_date:
-                queryset = queryset.filter(last_updated__date__gte=last_updated_after_date)
-                logger.debug("Filtering by last_updated_after date: %s", last_updated_after_date)
-        if last_updated_before:
-            last_updated_before_date = parse_date(last_updated_before)
-            if last_updated_before_date:
-                queryset = queryset.filter(last_updated__date__lte=last_updated_before_date)
-                logger.debug("Filtering by last_updated_before date: %s", last_updated_before_date)
-
-        # Handle `last_activity` in `CustomerRelationship`
-        last_activity = request.GET.get("last_activity")
-        last_activity_after = request.GET.get("last_activity_after")
-        last_activity_before = request.GET.get("last_activity_before")
-
-        if last_activity:
-            last_activity_date = parse_date(last_activity)
-            if last_activity_date:
-                queryset = queryset.filter(customerrelationship__last_activity__date=last_activity_date)
-                logger.debug("Filtering by exact last_activity date: %s", last_activity_date)
-
-        if last_activity_after:
-            last_activity_after_date = parse_date(last_activity_after)
-            if last_activity_after_date:
-                date_filters['customerrelationship__last_activity__date__gte'] = last_activity_after_date
-                logger.debug("Filtering by last_activity_after date: %s", last_activity_after_date)
-        if last_activity_before:
-            last_activity_before_date = parse_date(last_activity_before)
-            if last_activity_before_date:
-                date_filters['customerrelationship__last_activity__date__lte'] = last_activity_before_date
-                logger.debug("Filtering by last_activity_before date: %s", last_activity_before_date)
-
-        queryset = queryset.filter(**date_filters)
+        queryset = queryset.filter(**field_filters)
+        if relationship_filters:
+            queryset = queryset.filter(
+                Exists(CustomerRelationship.objects.filter(appuser=OuterRef("pk"), **relationship_filters))
+            )
     except Exception as e:
         logger.error("Error applying filters: %s", e)
-        return JsonResponse({"error": "Error applying filters"}, status=400)
+        return json_response({"error": "Error applying filters"}, status=400)
 
     try:
         # Apply sorting dynamically
-        queryset = queryset.order_by(sort_by)
+        queryset = order_entries(queryset, sort_field, order)
+
+        # Keyset pagination: seek past the cursor on the sort column's index instead of skipping rows with OFFSET,
+        # and leave out the total count, which would need all matching rows to be read
+        if after is not None:
+            direction = "lt" if order == "desc" else "gt"
+            if sort_field == "id":
+                queryset = queryset.filter(**{f"id__{direction}": after_id})
+            else:
+                # Rows tied with the cursor on the sort field are compared by id, so the cursor points past exactly
+                # one row. The inclusive bound on the sort field alone lets the index range scan start at the cursor.
+                queryset = queryset.filter(
+                    Q(**{f"{sort_field}__{direction}e": after_value}),
+                    Q(**{f"{sort_field}__{direction}": after_value}) | Q(**{f"id__{direction}": after_id}),
+                )
+            page_queryset = (
+                queryset.annotate(relationships=get_relationships_subquery())[:page_size]
+                .values_list(*APPUSER_VALUE_FIELDS, "relationships")
+            )
+        else:
+            offset = (page - 1) * page_size
+            # Without the count only the page and one more row are read, the extra row tells if a next page exists
+            limit = offset + page_size + 1 if no_count else offset + page_size
+            # The ids of the page are selected first, so the rows skipped by OFFSET are neither joined to their address
+            # nor run the relationships subquery; only the rows of the page are read in full and sorted again
+            page_queryset = order_entries(
+                AppUser.objects.filter(pk__in=queryset.values("pk")[offset:limit]), sort_field, order
+            ).annotate(relationships=get_relationships_subquery())
+            if no_count:
+                page_queryset = page_queryset.values_list(*APPUSER_VALUE_FIELDS, "relationships")
+            else:
+                # The total count is an uncorrelated subquery of the page query, evaluated once
+                page_queryset = page_queryset.annotate(
+                    total_items=Subquery(queryset.order_by().values(total=Func("pk", function="COUNT")))
+                ).values_list(*APPUSER_VALUE_FIELDS, "relationships", "total_items")
+
+        page_fields = get_page_fields(page, page_size, after)
+        summary = {}
+        # Streamed pages are read with a server-side cursor, STREAMING_CHUNK_SIZE rows at a time
+        streamed = response_format == "ndjson" or page_size > STREAMING_PAGE_SIZE
+        rows = page_queryset.iterator(chunk_size=STREAMING_CHUNK_SIZE) if streamed else iter(list(page_queryset))
+        chunks = iterate_page(queryset, rows, page, page_size, after, no_count, sort_field, summary)
+
+        # NDJSON is always streamed, one line per entry, whatever the page size
+        if response_format == "ndjson":
+            logger.info("Streaming NDJSON page %s with page size %s and cursor %s", page, page_size, after)
+            return streaming_response(
+                request, stream_ndjson_entries(page_fields, chunks, summary), "application/x-ndjson"
+            )
 
-        # Paginate results
-        paginator = Paginator(queryset, page_size)
-        paginated_data = paginator.get_page(page)
+        # Large pages are streamed chunk by chunk instead of being built in memory
+        if streamed:
+            logger.info("Streaming page %s with page size %s and cursor %s", page, page_size, after)
+            return streaming_response(request, stream_entries(page_fields, chunks, summary), "application/json")
     except Exception as e:
         logger.error("Error applying sorting or pagination: %s", e)
-        return JsonResponse({"error": "Error applying sorting or pagination"}, status=400)
+        return json_response({"error": "Error applying sorting or pagination"}, status=400)
 
-    # Serialize data
-    results = []
+    # Serialize data straight from the database rows without building model instances
     try:
-        for app_user in paginated_data:
-            results.append(
-                {
-                    "id": app_user.id,
-                    "first_name": app_user.first_name,
-                    "last_name": app_user.last_name,
-                    "gender": app_user.gender,
-                    "customer_id": app_user.customer_id,
-                    "phone_number": app_user.phone_number,
-                    "created": app_user.created,
-                    "birthday": app_user.birthday,
-                    "last_updated": app_user.last_updated,
-                    "address": {
-                        "address_id": app_user.address.id,
-                        "street": app_user.address.street,
-                        "street_number": app_user.address.street_number,
-                        "city_code": app_user.address.city_code,
-                        "city": app_user.address.city,
-                        "country": app_user.address.country,
-                    },
-                    "customer_relationships": [
-                        {
-                            "relationship_id": relationship.id,
-                            "points": relationship.points,
-                            "created": relationship.created,
-                            "last_activity": relationship.last_activity,
-                        }
-                        for relationship in app_user.customerrelationship_set.all()
-                    ],
-                }
-            )
+        results = [entry for entries in chunks for entry in entries]
     except Exception as e:
         logger.error("Error serializing data: %s", e)
-        return JsonResponse({"error": "Error serializing data"}, status=500)
-
-    response_data = {
-        "page": page,
-        "total_pages": paginator.num_pages,
-        "total_items": paginator.count,
-        "results": results,
-    }
+        return json_response({"error": "Error serializing data"}, status=500)
+
+    # The summary is filled once the chunks have been read
+    response_data = {**page_fields, **summary, "results": results}
     # Cache the response for 30 minutes
     cache.set(cache_key, response_data, timeout=60 * 30)
 
     # Return JSON response
-    return JsonResponse(response_data)
+    return json_response(response_data)
+
+
+# Serve the entries asynchronously, the database and cache work runs in a worker thread so the event loop stays free
+async def list_entries(request):
+    return await sync_to_async(build_entries_response)(request)